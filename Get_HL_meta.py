@@ -1,95 +1,112 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import csv
 import re
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-import requests
-import xmltodict
+try:  # optional DFA-based regex backend; the stdlib engine is a fine fallback
+    import re2 as _re
+except ImportError:
+    _re = re
+
+import httpx
+from lxml import etree
 
 BASE_URL = "https://api.lib.harvard.edu/v2/items"
-DEFAULT_SLEEP = 0.15  # be polite between page fetches
+MAX_CONNECTIONS = 8  # concurrent page fetches (streams over one HTTP/2 connection)
+REQUESTS_PER_SECOND = 10.0  # be polite to the API even when fetching in parallel
+
+MODS_NS = "http://www.loc.gov/mods/v3"
+NS = {"mods": MODS_NS}
+_MODS_TAG = f"{{{MODS_NS}}}mods"
+
+class RateLimiter:
+    """Token-bucket limiter shared by the fetch tasks."""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
 
 # ---------------- utils ----------------
-def as_list(x: Any) -> List:
-    if x is None:
-        return []
-    return x if isinstance(x, list) else [x]
-
-def strip_ns(obj):
-    """Strip XML namespace prefixes (mods:titleInfo -> titleInfo)."""
-    if isinstance(obj, dict):
-        out = {}
-        for k, v in obj.items():
-            nk = k.split(":", 1)[1] if isinstance(k, str) and ":" in k else k
-            out[nk] = strip_ns(v)
-        return out
-    if isinstance(obj, list):
-        return [strip_ns(x) for x in obj]
-    return obj
-
-def nget(d: Any, key: str) -> Any:
-    """Namespace-agnostic get: exact key or suffix after ':'."""
-    if not isinstance(d, dict):
-        return None
-    if key in d:
-        return d[key]
-    for k, v in d.items():
-        if isinstance(k, str) and k.split(":")[-1] == key:
-            return v
-    return None
-
-def get_text(node: Any, *path: Union[str, int]) -> Optional[str]:
-    """Path lookup with namespace-insensitive keys and #text handling."""
-    cur = node
-    for key in path:
-        if cur is None:
-            return None
-        if isinstance(key, int):
-            if isinstance(cur, list) and 0 <= key < len(cur):
-                cur = cur[key]
-            else:
-                return None
-        else:
-            if isinstance(cur, dict) and key in cur:
-                cur = cur[key]
-            else:
-                if isinstance(cur, dict):
-                    found = False
-                    for k, v in cur.items():
-                        if isinstance(k, str) and k.split(":")[-1] == key:
-                            cur = v
-                            found = True
-                            break
-                    if not found:
-                        return None
-                else:
-                    return None
-    if cur is None:
-        return None
-    if isinstance(cur, dict):
-        if "#text" in cur and cur["#text"] is not None:
-            return str(cur["#text"])
-        if "text" in cur and cur["text"] is not None:
-            return str(cur["text"])
-        return None
-    if isinstance(cur, (str, int, float)):
-        return str(cur)
-    return None
+@lru_cache(maxsize=None)
+def _mods_path(tag: str) -> str:
+    """Resolve a bare MODS local name to its 'mods:' ElementPath, cached."""
+    return f"mods:{tag}"
+
+def _dedupe(values: List[str]) -> List[str]:
+    """Drop repeats preserving order, without building a throwaway dict."""
+    seen = set()
+    out = []
+    for v in values:
+        if v not in seen:
+            seen.add(v)
+            out.append(v)
+    return out
 
 def join_clean(values: List[Optional[str]]) -> str:
-    return "; ".join(dict.fromkeys([v.strip() for v in values if v and str(v).strip()]))
+    seen = set()
+    out = []
+    for v in values:
+        if v and (s := str(v).strip()) and s not in seen:
+            seen.add(s)
+            out.append(s)
+    return "; ".join(out)
 
 # ---------------- extractors ----------------
-def extract_title(mods: Dict) -> str:
+# XPaths for the plain text-list fields, compiled once at import and evaluated
+# thousands of times per harvest. smart_strings=False returns plain str values
+# so extracted text does not pin the cleared element trees in memory.
+def _xp(path: str) -> etree.XPath:
+    return etree.XPath(path, namespaces=NS, smart_strings=False)
+
+# lxml hands back text verbatim, unlike xmltodict's strip_whitespace default;
+# normalize at the point of extraction so padded values (e.g. the conventional
+# trailing space in nonSort) never reach the CSV or the startswith checks.
+def _strip(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    text = text.strip()
+    return text or None
+
+def _findtext(el: etree._Element, path: str) -> Optional[str]:
+    """findtext against the MODS namespace with stripped text."""
+    return _strip(el.findtext(path, None, NS))
+
+_XP_PUBLISHER = _xp("./mods:originInfo/mods:publisher/text()")
+_XP_PLACE_TERM = _xp("./mods:originInfo/mods:place/mods:placeTerm/text()")
+_XP_LANGUAGE_TERM = _xp("./mods:language/mods:languageTerm/text()")
+_XP_TYPE_OF_RESOURCE = _xp("./mods:typeOfResource/text()")
+_XP_PHYSICAL_LOCATION = _xp("./mods:location/mods:physicalLocation/text()")
+_XP_SHELF_LOCATOR = _xp("./mods:location/mods:shelfLocator/text()")
+_XP_RECORD_IDENTIFIER = _xp("./mods:recordInfo/mods:recordIdentifier/text()")
+_XP_RELATED_URL = _xp("./mods:relatedItem/mods:location/mods:url/text()")
+_XP_TOC = _xp("./mods:tableOfContents/text()")
+
+def extract_title(mods: etree._Element) -> str:
     titles = []
-    for ti in as_list(nget(mods, "titleInfo")):
-        t = get_text(ti, "title")
-        non = get_text(ti, "nonSort")
-        sub = get_text(ti, "subTitle")
+    for ti in mods.iterfind("mods:titleInfo", NS):
+        t = _findtext(ti, "mods:title")
+        non = _findtext(ti, "mods:nonSort")
+        sub = _findtext(ti, "mods:subTitle")
         # Skip "alternative"/uniform etc. here; main titleInfo has no @type or is 'translated' only when that's the main.
-        ttype = (ti.get("@type") or "").lower() if isinstance(ti, dict) else ""
+        ttype = (ti.get("type") or "").lower()
         if t and ttype in ("", "translated"):  # keep main; allow translated when it appears as primary
             full = " ".join([x for x in [non, t] if x])  # nonSort before title (e.g., "The ")
             if sub:
@@ -97,14 +114,14 @@ def extract_title(mods: Dict) -> str:
             titles.append(full)
     return titles[0] if titles else ""
 
-def extract_variant_titles(mods: Dict) -> str:
+def extract_variant_titles(mods: etree._Element) -> str:
     out = []
-    for ti in as_list(nget(mods, "titleInfo")):
-        ttype = (ti.get("@type") or "").lower() if isinstance(ti, dict) else ""
+    for ti in mods.iterfind("mods:titleInfo", NS):
+        ttype = (ti.get("type") or "").lower()
         if ttype in {"alternative", "translated", "uniform", "abbreviated"}:
-            t = get_text(ti, "title")
-            non = get_text(ti, "nonSort")
-            sub = get_text(ti, "subTitle")
+            t = _findtext(ti, "mods:title")
+            non = _findtext(ti, "mods:nonSort")
+            sub = _findtext(ti, "mods:subTitle")
             if t or non or sub:
                 full = " ".join([x for x in [non, t] if x])
                 if sub:
@@ -113,16 +130,19 @@ def extract_variant_titles(mods: Dict) -> str:
                     out.append(full)
     return join_clean(out)
 
-def _display_name_with_dates(name_node: Dict) -> str:
+def _display_name_with_dates(name_el: etree._Element,
+                             name_parts: Optional[List[etree._Element]] = None) -> str:
+    if name_parts is None:
+        name_parts = name_el.findall("mods:namePart", NS)
     other_parts, date_parts = [], []
-    for np in as_list(nget(name_node, "namePart")):
-        txt = (get_text(np) if isinstance(np, dict) else (str(np) if np is not None else "")).strip()
+    for np in name_parts:
+        txt = (np.text or "").strip()
         if not txt:
             continue
-        tp = (np.get("@type") or "").lower() if isinstance(np, dict) else ""
+        tp = (np.get("type") or "").lower()
         (date_parts if tp == "date" else other_parts).append(txt)
     if not other_parts:
-        disp = (get_text(name_node, "displayForm") or "").strip()
+        disp = (name_el.findtext("mods:displayForm", "", NS) or "").strip()
         if disp:
             other_parts.append(disp)
     name = " ".join(other_parts).strip()
@@ -130,308 +150,294 @@ def _display_name_with_dates(name_node: Dict) -> str:
         name = f"{name} ({'; '.join(date_parts)})"
     return name
 
-def extract_creators(mods: Dict) -> str:
-    """People that carry creator-ish roles: aut, cmp, cre, prf, voc OR roleTerm text matches."""
-    want_codes = {"aut", "cmp", "cre", "prf", "voc"}
-    want_texts = {"author", "composer", "creator", "performer", "vocalist", "singer", "voice"}
-    out = []
-    for n in as_list(nget(mods, "name")):
-        # Only people for 'creator' column
-        ntype = (n.get("@type") or "").lower() if isinstance(n, dict) else ""
-        if ntype and ntype != "personal":
-            continue
-        is_creator = False
-        for role in as_list(nget(n, "role")):
-            for rt in as_list(nget(role, "roleTerm")):
-                t = (get_text(rt) or "").strip().lower()
-                is_code = isinstance(rt, dict) and (rt.get("@type") or "").lower() == "code"
-                if (is_code and t in want_codes) or (t in want_texts):
-                    is_creator = True
-        # Heuristic: also include usage="primary" even if role terms are missing
-        if not is_creator:
-            usage = (n.get("@usage") or "").lower() if isinstance(n, dict) else ""
-            if usage != "primary":
+# Creator-ish roles: aut, cmp, cre, prf, voc OR roleTerm text matches.
+_CREATOR_ROLE_CODES = {"aut", "cmp", "cre", "prf", "voc"}
+_CREATOR_ROLE_TEXTS = {"author", "composer", "creator", "performer", "vocalist", "singer", "voice"}
+
+class Name(NamedTuple):
+    """One mods/name with its attributes pre-lowered and roles pre-resolved."""
+    ntype: str
+    usage: str
+    role_codes: frozenset
+    role_texts: frozenset
+    single_name_part: bool
+    disp: str
+
+def _prepare_names(mods: etree._Element) -> List[Name]:
+    """Walk mods/name once, resolving attributes, role terms and display form."""
+    out: List[Name] = []
+    for n in mods.iterfind("mods:name", NS):
+        codes, texts = set(), set()
+        for rt in n.iterfind("mods:role/mods:roleTerm", NS):
+            t = (rt.text or "").strip().lower()
+            if not t:
                 continue
-        disp = _display_name_with_dates(n)
-        if disp:
-            out.append(disp)
-    return "; ".join(dict.fromkeys(out))
-
-def extract_personal_names_split(mods: Dict) -> Tuple[str, str, str, str]:
-    """All personal names, first 3 into name1..name3, rest in names_other; format Name (dates)."""
-    names = []
-    for n in as_list(nget(mods, "name")):
-        ntype = (n.get("@type") or "").lower() if isinstance(n, dict) else ""
-        if ntype and ntype != "personal":
+            texts.add(t)
+            if (rt.get("type") or "").lower() == "code":
+                codes.add(t)
+        name_parts = n.findall("mods:namePart", NS)  # shared with the display render
+        out.append(Name(
+            ntype=(n.get("type") or "").lower(),
+            usage=(n.get("usage") or "").lower(),
+            role_codes=frozenset(codes),
+            role_texts=frozenset(texts),
+            single_name_part=bool(len(name_parts) == 1 and (name_parts[0].text or "").strip()),
+            disp=_display_name_with_dates(n, name_parts),
+        ))
+    return out
+
+def _classify_names(mods: etree._Element) -> Tuple[List[str], List[str], List[str]]:
+    """Classify each prepared name's display form as creator/personal/corporate."""
+    creators: List[str] = []
+    personal: List[str] = []
+    corporate: List[str] = []
+    for nm in _prepare_names(mods):
+        if not nm.disp:
             continue
-        disp = _display_name_with_dates(n)
-        if disp:
-            names.append(disp)
-    names = list(dict.fromkeys(names))  # de-dupe preserving order
-    n1 = names[0] if len(names) > 0 else ""
-    n2 = names[1] if len(names) > 1 else ""
-    n3 = names[2] if len(names) > 2 else ""
-    other = "; ".join(names[3:]) if len(names) > 3 else ""
-    return n1, n2, n3, other
-
-def extract_corporate_names(mods: Dict) -> str:
-    corps = []
-    for n in as_list(nget(mods, "name")):
-        ntype = (n.get("@type") or "").lower() if isinstance(n, dict) else ""
-        if ntype == "corporate" or (ntype == "" and get_text(n, "namePart") and not as_list(nget(n, "namePart"))[0] == ""):
-            # treat explicit corporate types as corporate
-            disp = _display_name_with_dates(n)
-            if disp:
-                corps.append(disp)
-    return "; ".join(dict.fromkeys(corps))
-
-def extract_publisher(mods: Dict) -> str:
-    for oi in as_list(nget(mods, "originInfo")):
-        pub = get_text(oi, "publisher")
-        if pub:
-            return pub
+        # treat explicit corporate types as corporate; the heuristic for untyped
+        # names only applies to a lone namePart, so multi-part names (typically
+        # personal names carrying a type="date" part) never land here
+        if nm.ntype == "corporate" or (nm.ntype == "" and nm.single_name_part):
+            corporate.append(nm.disp)
+        # only people for the personal/creator columns
+        if nm.ntype and nm.ntype != "personal":
+            continue
+        personal.append(nm.disp)
+        # Heuristic: also include usage="primary" even if role terms are missing
+        if (nm.role_codes & _CREATOR_ROLE_CODES) or (nm.role_texts & _CREATOR_ROLE_TEXTS) \
+                or nm.usage == "primary":
+            creators.append(nm.disp)
+    return creators, personal, corporate
+
+def _first(values: List[str]) -> str:
+    for v in values:
+        if (s := v.strip()):
+            return s
     return ""
 
-def extract_place(mods: Dict) -> str:
-    places = []
-    for oi in as_list(nget(mods, "originInfo")):
-        for pl in as_list(nget(oi, "place")):
-            # prefer text
-            txt = get_text(pl, "placeTerm")
-            if not txt:
-                # sometimes two placeTerm nodes (code/text)
-                for pt in as_list(nget(pl, "placeTerm")):
-                    t = get_text(pt)
-                    if t:
-                        places.append(t)
-            else:
-                places.append(txt)
-    return join_clean(places)
-
-def extract_date(mods: Dict) -> str:
+# Columns that reduce to one compiled-XPath evaluation, as (column, xpath,
+# reducer). Columns needing attribute logic keep their dedicated extractors.
+SIMPLE_FIELDS = (
+    ("publisher", _XP_PUBLISHER, _first),
+    ("place", _XP_PLACE_TERM, join_clean),
+    ("language", _XP_LANGUAGE_TERM, join_clean),
+    ("type_of_resource", _XP_TYPE_OF_RESOURCE, join_clean),
+    ("repository", _XP_PHYSICAL_LOCATION, join_clean),
+    ("call_number", _XP_SHELF_LOCATOR, join_clean),
+)
+
+def extract_date(mods: etree._Element) -> str:
     dates = []
-    for oi in as_list(nget(mods, "originInfo")):
+    for oi in mods.iterfind("mods:originInfo", NS):
         for k in ("dateIssued", "dateCreated", "dateOther"):
-            for v in as_list(nget(oi, k)):
-                txt = get_text(v) if isinstance(v, dict) else (str(v) if v is not None else None)
-                if txt:
-                    dates.append(txt)
+            for v in oi.iterfind(_mods_path(k), NS):
+                if v.text:
+                    dates.append(v.text)
     return join_clean(dates)
 
-def extract_language(mods: Dict) -> str:
-    langs = []
-    for lang in as_list(nget(mods, "language")):
-        for lt in as_list(nget(lang, "languageTerm")):
-            t = get_text(lt)
-            if t:
-                langs.append(t)
-    return join_clean(langs)
-
-def extract_type_of_resource(mods: Dict) -> str:
-    vals = []
-    for tor in as_list(nget(mods, "typeOfResource")):
-        t = get_text(tor) if isinstance(tor, dict) else (str(tor) if tor is not None else None)
-        if t:
-            vals.append(t)
-    return join_clean(vals)
-
-def extract_physical_description(mods: Dict) -> str:
+def extract_physical_description(mods: etree._Element) -> str:
     chunks = []
-    for pd in as_list(nget(mods, "physicalDescription")):
+    for pd in mods.iterfind("mods:physicalDescription", NS):
         for k in ("extent", "form", "note", "internetMediaType"):
-            for v in as_list(nget(pd, k)):
-                txt = get_text(v) if isinstance(v, dict) else (str(v) if v is not None else None)
-                if txt:
-                    chunks.append(txt)
+            for v in pd.iterfind(_mods_path(k), NS):
+                if v.text:
+                    chunks.append(v.text)
     return join_clean(chunks)
 
-def extract_keywords(mods: Dict) -> str:
+def extract_keywords(mods: etree._Element) -> str:
     kw = []
-    for subj in as_list(nget(mods, "subject")):
+    for subj in mods.iterfind("mods:subject", NS):
         for key in ("topic", "geographic", "temporal", "genre"):
-            for val in as_list(nget(subj, key)):
-                txt = get_text(val) if isinstance(val, dict) else (str(val) if val is not None else None)
-                if txt:
-                    kw.append(txt)
-        for nm in as_list(nget(subj, "name")):
-            for np in as_list(nget(nm, "namePart")):
-                txt = get_text(np) if isinstance(np, dict) else (str(np) if np is not None else None)
-                if txt:
-                    kw.append(txt)
+            for val in subj.iterfind(_mods_path(key), NS):
+                if val.text:
+                    kw.append(val.text)
+        for np in subj.iterfind("mods:name/mods:namePart", NS):
+            if np.text:
+                kw.append(np.text)
     return join_clean(kw)
 
-def extract_repository_and_callnum(mods: Dict) -> Tuple[str, str]:
-    repos = []
-    callnums = []
-    for loc in as_list(nget(mods, "location")):
-        phys = get_text(loc, "physicalLocation")
-        if phys:
-            repos.append(phys)
-        for pl in as_list(nget(loc, "physicalLocation")):
-            t = get_text(pl)
-            if t:
-                repos.append(t)
-        for sl in as_list(nget(loc, "shelfLocator")):
-            t = get_text(sl)
-            if t:
-                callnums.append(t)
-    return join_clean(repos), join_clean(callnums)
-
-def extract_issue_number(mods: Dict) -> str:
+def extract_issue_number(mods: etree._Element) -> str:
     nums = []
-    for idn in as_list(nget(mods, "identifier")):
-        t = (idn.get("@type") or "").lower() if isinstance(idn, dict) else ""
-        val = get_text(idn) if isinstance(idn, dict) else (str(idn) if idn is not None else None)
-        if val and t == "issue number":
-            nums.append(val)
+    for idn in mods.iterfind("mods:identifier", NS):
+        t = (idn.get("type") or "").lower()
+        if idn.text and t == "issue number":
+            nums.append(idn.text)
     return join_clean(nums)
 
-def extract_record_identifier(mods: Dict) -> str:
+def extract_record_identifier(mods: etree._Element) -> str:
     """Return first recordInfo/recordIdentifier text."""
-    for recinfo in as_list(nget(mods, "recordInfo")):
-        for rid in as_list(nget(recinfo, "recordIdentifier")):
-            txt = get_text(rid)
-            if txt:
-                return txt
+    for rid in _XP_RECORD_IDENTIFIER(mods):
+        rid = rid.strip()
+        if rid:
+            return rid
     return ""
 
+_HOLLIS_RE = _re.compile(r"99\d{14,}")
+
 def find_digits(s: str) -> Optional[str]:
-    m = re.search(r"(99\d{14,})", s)
-    return m.group(1) if m else None
+    m = _HOLLIS_RE.search(s)
+    return m.group(0) if m else None
 
-def extract_hollis_number(mods: Dict, item: Dict) -> str:
+def extract_hollis_number(mods: etree._Element) -> str:
     # 1) Prefer recordInfo/recordIdentifier with ALMA-ish value
-    rid = ""
-    for recinfo in as_list(nget(mods, "recordInfo")):
-        for ridnode in as_list(nget(recinfo, "recordIdentifier")):
-            txt = get_text(ridnode) or ""
-            src = (ridnode.get("@source") or "").lower() if isinstance(ridnode, dict) else ""
-            if txt and (src.find("alma") >= 0 or txt.startswith("99")):
-                rid = txt
-                break
-        if rid:
-            break
-    if rid:
-        return rid
-
-    # 2) Fall back to relatedItem or extension/librarycloud/originalDocument URLs
-    for rel in as_list(nget(mods, "relatedItem")):
-        url = get_text(rel, "location", "url")
-        if url:
-            d = find_digits(url)
-            if d:
-                return d
+    for rid in mods.iterfind("mods:recordInfo/mods:recordIdentifier", NS):
+        txt = (rid.text or "").strip()
+        src = (rid.get("source") or "").lower()
+        if txt and (src.find("alma") >= 0 or txt.startswith("99")):
+            return txt
+
+    # 2) Fall back to relatedItem URLs
+    for url in _XP_RELATED_URL(mods):
+        d = find_digits(url)
+        if d:
+            return d
 
     # 3) Look inside any extension/originalDocument
-    for ext in as_list(nget(mods, "extension")):
-        od = get_text(ext, "librarycloud", "originalDocument")
-        if od:
-            d = find_digits(od)
-            if d:
-                return d
+    for ext in mods.iterfind("mods:extension", NS):
+        for od in ext.iter("{*}originalDocument"):
+            if od.text:
+                d = find_digits(od.text)
+                if d:
+                    return d
 
     return ""
 
-def extract_permalink(item: Dict) -> str:
+def extract_permalink(mods: etree._Element) -> str:
     # Prefer explicit HOLLIS relatedItem
-    mods = item.get("mods") or {}
-    for rel in as_list(nget(mods, "relatedItem")):
-        oth = (rel.get("@otherType") or "").lower() if isinstance(rel, dict) else ""
+    for rel in mods.iterfind("mods:relatedItem", NS):
+        oth = (rel.get("otherType") or "").lower()
         if "hollis" in oth:
-            url = get_text(rel, "location", "url")
+            url = _findtext(rel, "mods:location/mods:url")
             if url:
                 return url
     # Else any location/url that looks like HOLLIS or a stable link
-    for loc in as_list(nget(mods, "location")):
-        for urlnode in as_list(nget(loc, "url")):
-            u = get_text(urlnode)
-            if u:
-                return u
+    for urlnode in mods.iterfind("mods:location/mods:url", NS):
+        u = _strip(urlnode.text)
+        if u:
+            return u
     # Last resort: nothing
     return ""
 
-def extract_tocs(mods: Dict) -> List[str]:
-    out = []
-    for toc in as_list(nget(mods, "tableOfContents")):
-        txt = get_text(toc) if isinstance(toc, dict) else (str(toc) if toc is not None else None)
-        if txt:
-            out.append(txt)
-    return out
+def extract_tocs(mods: etree._Element) -> List[str]:
+    return [s for toc in _XP_TOC(mods) if (s := toc.strip())]
 
-def extract_notes(mods: Dict) -> List[str]:
+def extract_notes(mods: etree._Element) -> List[str]:
     out = []
-    for note in as_list(nget(mods, "note")):
-        txt = get_text(note) if isinstance(note, dict) else (str(note) if note is not None else None)
+    for note in mods.iterfind("mods:note", NS):
+        txt = _strip(note.text)
         if txt:
-            t = (note.get("@type") or "").strip() if isinstance(note, dict) else ""
+            t = (note.get("type") or "").strip()
             out.append(f"{t}: {txt}" if t else txt)
     return out
 
 # ---------------- fetch & parse ----------------
-def fetch(session: requests.Session, url: str, params: Dict, verbose: bool = False) -> Dict:
-    full = requests.Request("GET", url, params=params).prepare().url
+def make_client() -> httpx.AsyncClient:
+    """HTTP/2 client: one TLS handshake, pages multiplexed over it."""
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=5,  # connect-level retries; one handshake amortized over all pages
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+        ),
+        headers={
+            "Accept": "application/xml",
+            "Accept-Encoding": "gzip",
+            "User-Agent": "Get-HL-metadata/1.0",
+        },
+        timeout=30.0,
+    )
+
+# Transient statuses worth retrying with backoff (throttling and server-side
+# hiccups); connect-level failures are retried by the transport itself.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.3
+
+async def fetch(client: httpx.AsyncClient, url: str, params: Dict,
+                limiter: Optional[RateLimiter] = None,
+                verbose: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
     if verbose:
         print("PARAMS:", params)
-        print("GET", full)
-    r = session.get(url, params=params, timeout=30)
-    if verbose:
-        print("Status", r.status_code, r.headers.get("content-type", ""))
-    r.raise_for_status()
-    return strip_ns(xmltodict.parse(r.text))
-
-def parse_page(parsed: Dict) -> Tuple[List[Dict], Dict[str, int]]:
-    results = parsed.get("results", {}) or {}
-    pagination = results.get("pagination", {}) or {}
-    start = int(pagination.get("start") or 0)
-    limit = int(pagination.get("limit") or 10)
-    num_found = int(pagination.get("numFound") or 0)
-
-    items_node = results.get("items", {}) or {}
-    mods_list = items_node.get("mods")
-    if mods_list is None:
-        items = []
-    else:
-        items = mods_list if isinstance(mods_list, list) else [mods_list]
-    wrapped = [{"mods": m} for m in items]
-    return wrapped, {"start": start, "limit": limit, "numFound": num_found}
+        print("GET", str(httpx.URL(url).copy_merge_params(params)))
+    for attempt in range(MAX_RETRIES + 1):
+        if limiter is not None:
+            await limiter.acquire()
+        async with client.stream("GET", url, params=params) as r:
+            if verbose:
+                print("Status", r.status_code, r.headers.get("content-type", ""))
+            if r.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                r.raise_for_status()
+                return await parse_page(r)
+            delay = BACKOFF_FACTOR * (2 ** attempt)
+            retry_after = r.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        if verbose:
+            print(f"Got retryable status; sleeping {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+        await asyncio.sleep(delay)
+
+async def parse_page(r: httpx.Response) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Stream-parse one result page: extract a row per mods record as it ends."""
+    rows: List[Dict[str, Any]] = []
+    pagination = {"start": 0, "limit": 10, "numFound": 0}
+    # resolve_entities/no_network off: API responses never need them, and it
+    # hardens the parser against entity-expansion tricks (defusedxml-style)
+    parser = etree.XMLPullParser(events=("end",), tag=(_MODS_TAG, "{*}pagination"),
+                                 resolve_entities=False, no_network=True)
+
+    def consume_events() -> None:
+        for _, elem in parser.read_events():
+            if elem.tag == _MODS_TAG:
+                rows.append(row_from_item(elem))
+            else:
+                for child in elem:
+                    local = etree.QName(child).localname
+                    if local in pagination and child.text:
+                        pagination[local] = int(child.text)
+            elem.clear()  # release the subtree; we never revisit it
+
+    async for chunk in r.aiter_bytes():
+        parser.feed(chunk)
+        consume_events()
+    parser.close()
+    consume_events()
+    return rows, pagination
 
 # ---------------- row builder ----------------
-def row_from_item(item: Dict) -> Dict[str, Any]:
-    mods = item.get("mods") or {}
-
-    name1, name2, name3, names_other = extract_personal_names_split(mods)
-    repository, callnum = extract_repository_and_callnum(mods)
+def row_from_item(mods: etree._Element) -> Dict[str, Any]:
+    creators, personal, corporate = _classify_names(mods)
+    # first 3 personal names into name1..name3, rest in names_other
+    names = _dedupe(personal)  # de-dupe preserving order
+    name1 = names[0] if len(names) > 0 else ""
+    name2 = names[1] if len(names) > 1 else ""
+    name3 = names[2] if len(names) > 2 else ""
+    names_other = "; ".join(names[3:]) if len(names) > 3 else ""
 
     row = {
         "identifier": "",  # first generic identifier if needed (fill below)
-        "hollis_number": extract_hollis_number(mods, item),
+        "hollis_number": extract_hollis_number(mods),
         "title": extract_title(mods),
         "variant_title": extract_variant_titles(mods),
-        "creator": extract_creators(mods),
+        "creator": "; ".join(_dedupe(creators)),
         "name1": name1,
         "name2": name2,
         "name3": name3,
         "names_other": names_other,
-        "corporate_name": extract_corporate_names(mods),
-        "publisher": extract_publisher(mods),
-        "place": extract_place(mods),
+        "corporate_name": "; ".join(_dedupe(corporate)),
         "date": extract_date(mods),
-        "language": extract_language(mods),
-        "type_of_resource": extract_type_of_resource(mods),
         "physical_description": extract_physical_description(mods),
         "keyword": extract_keywords(mods),
-        "repository": repository,
-        "call_number": callnum,
         "issue_number": extract_issue_number(mods),
-        "permalink": extract_permalink(item),
+        "permalink": extract_permalink(mods),
     }
+    for col, xpath, reduce_values in SIMPLE_FIELDS:
+        row[col] = reduce_values(xpath(mods))
 
     # choose a generic identifier if present
     first_ident = None
-    for idn in as_list(nget(mods, "identifier")):
-        val = get_text(idn) if isinstance(idn, dict) else (str(idn) if idn is not None else None)
-        if val:
-            first_ident = val
+    for idn in mods.iterfind("mods:identifier", NS):
+        first_ident = _strip(idn.text)
+        if first_ident:
             break
     if not first_ident:
         # fall back to HOLLIS number
@@ -448,8 +454,11 @@ def row_from_item(item: Dict) -> Dict[str, Any]:
 def parse_args():
     ap = argparse.ArgumentParser(description="Harvest Harvard LibraryCloud items to CSV")
     ap.add_argument("--q", required=True, help="Query string")
-    ap.add_argument("--page-size", type=int, default=50, help="Records per page (limit)")
+    ap.add_argument("--page-size", type=int, default=100,
+                    help="Records per page (limit); LibraryCloud accepts up to 250")
     ap.add_argument("--max-records", type=int, default=2000, help="Max records to write")
+    ap.add_argument("--max-tocs", type=int, default=20, help="Number of tocN columns")
+    ap.add_argument("--max-notes", type=int, default=20, help="Number of noteN columns")
     ap.add_argument("--output", default="librarycloud_items.csv", help="Output CSV filename")
     ap.add_argument("--verbose", action="store_true")
     return ap.parse_args()
@@ -479,80 +488,104 @@ BASE_COLUMNS = [
 ]
 
 # ---------------- main ----------------
-def main():
-    args = parse_args()
-
-    rows: List[Dict[str, Any]] = []
-    max_tocs = 0
-    max_notes = 0
+def row_values(r: Dict[str, Any], max_tocs: int, max_notes: int) -> List[Any]:
+    """Flatten a row dict into positional CSV values with padded toc/note columns."""
+    tocs = r.get("_tocs", [])
+    notes = r.get("_notes", [])
+    return ([r.get(k, "") for k in BASE_COLUMNS]
+            + [tocs[i] if i < len(tocs) else "" for i in range(max_tocs)]
+            + [notes[i] if i < len(notes) else "" for i in range(max_notes)])
+
+async def harvest(args, writer) -> int:
+    """Fetch all pages for the query, streaming rows to the CSV writer.
+
+    Returns the number of rows written. Pages are written as they complete;
+    a page finishing ahead of a lower offset is buffered only until the gap
+    fills, so resident memory stays O(out-of-order pages) rather than
+    O(all rows).
+    """
     written = 0
     seen_keys = set()
+    done = False
+
+    def write_page(page_rows: List[Dict[str, Any]]) -> bool:
+        """Write one page's rows; True once --max-records is reached."""
+        nonlocal written
+        for row in page_rows:
+            # de-dupe based on hollis_number or (identifier, permalink)
+            key = row.get("hollis_number") or (row.get("identifier"), row.get("permalink"))
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+
+            writer.writerow(row_values(row, args.max_tocs, args.max_notes))
+            written += 1
+            if written >= args.max_records:
+                return True
+        return False
 
-    with requests.Session() as s:
-        start = 0
-        limit = max(1, min(args.page_size, 250))  # keep it reasonable
+    async with make_client() as client:
+        limit = max(1, min(args.page_size, 250))  # clamp to the API maximum
+        limiter = RateLimiter(REQUESTS_PER_SECOND, burst=MAX_CONNECTIONS)
 
         # fetch first page to learn numFound
-        parsed = fetch(s, BASE_URL, {"q": args.q, "start": start, "limit": limit}, verbose=args.verbose)
-        items, pg = parse_page(parsed)
+        page_rows, pg = await fetch(client, BASE_URL, {"q": args.q, "start": 0, "limit": limit},
+                                    limiter=limiter, verbose=args.verbose)
         num_found = pg["numFound"]
         if args.verbose:
-            print(f"Parsed {len(items)} item(s) from XML; pagination={pg}")
+            print(f"Parsed {len(page_rows)} item(s) from XML; pagination={pg}")
+        done = write_page(page_rows)
+
+        # fetch the remaining pages concurrently, writing each page as soon as
+        # every lower offset has been written; out-of-order pages wait in a buffer
+        starts = range(limit, min(num_found, args.max_records), limit)
+        if starts and not done:
+            async def fetch_page(st: int):
+                result = await fetch(client, BASE_URL,
+                                     {"q": args.q, "start": st, "limit": limit},
+                                     limiter, args.verbose)
+                return st, result
+
+            tasks = [asyncio.create_task(fetch_page(st)) for st in starts]
+            buffered: Dict[int, List[Dict[str, Any]]] = {}
+            next_start = limit
+            try:
+                for fut in asyncio.as_completed(tasks):
+                    st, (page_rows, pg) = await fut
+                    if args.verbose:
+                        print(f"Parsed {len(page_rows)} item(s) from XML; pagination={pg}")
+                    buffered[st] = page_rows
+                    while next_start in buffered:
+                        if write_page(buffered.pop(next_start)):
+                            done = True
+                            break
+                        next_start += limit
+                    if done:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
-        # process loop
-        while True:
-            for it in items:
-                row = row_from_item(it)
-                # de-dupe based on hollis_number or (identifier, permalink)
-                key = row.get("hollis_number") or (row.get("identifier"), row.get("permalink"))
-                if key in seen_keys:
-                    continue
-                seen_keys.add(key)
-
-                rows.append(row)
-                max_tocs = max(max_tocs, len(row.get("_tocs", [])))
-                max_notes = max(max_notes, len(row.get("_notes", [])))
-                written += 1
-                if written >= args.max_records:
-                    break
-            if written >= args.max_records:
-                break
-
-            start += limit
-            if start >= num_found:
-                if args.verbose:
-                    print("Reached end of results.")
-                break
-
-            time.sleep(DEFAULT_SLEEP)
-            parsed = fetch(s, BASE_URL, {"q": args.q, "start": start, "limit": limit}, verbose=args.verbose)
-            items, pg = parse_page(parsed)
-            if args.verbose:
-                print(f"Parsed {len(items)} item(s) from XML; pagination={pg}")
-            if not items:
-                break
-
-    # build dynamic header
+    return written
+
+def main():
+    args = parse_args()
+
+    # toc/note columns are a fixed width (--max-tocs/--max-notes) so the
+    # header is known up front and rows can stream to disk as they arrive
     fieldnames = list(BASE_COLUMNS)
-    for i in range(1, max_tocs + 1):
+    for i in range(1, args.max_tocs + 1):
         fieldnames.append(f"toc{i}")
-    for i in range(1, max_notes + 1):
+    for i in range(1, args.max_notes + 1):
         fieldnames.append(f"note{i}")
 
-    # write CSV
     with open(args.output, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for r in rows:
-            out = {k: r.get(k, "") for k in BASE_COLUMNS}
-            # expand tocs/notes
-            for i in range(1, max_tocs + 1):
-                out[f"toc{i}"] = r.get("_tocs", [])[i - 1] if i - 1 < len(r.get("_tocs", [])) else ""
-            for i in range(1, max_notes + 1):
-                out[f"note{i}"] = r.get("_notes", [])[i - 1] if i - 1 < len(r.get("_notes", [])) else ""
-            w.writerow(out)
-
-    print(f"Wrote {len(rows)} rows to {args.output}")
+        w = csv.writer(f)
+        w.writerow(fieldnames)
+        written = asyncio.run(harvest(args, w))
+
+    print(f"Wrote {written} rows to {args.output}")
 
 if __name__ == "__main__":
     main()